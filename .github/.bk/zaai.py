@@ -6,21 +6,84 @@ Z.AI API 客户端封装
 
 依赖：
     - requests (标准HTTP库)
-    - 标准库: json, time, uuid, hmac, hashlib, base64, urllib
+    - orjson (可选，安装后用于加速JSON编解码)
+    - 标准库: os, re, json, time, math, hmac, base64, binascii, urllib
 
 使用示例见文件底部 if __name__ == "__main__"
 """
 
+import os
 import json
 import time
-import uuid
+import math
 import hmac
-import hashlib
+import re
 import base64
+import binascii
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urlencode
-from typing import Dict, List, Any, Optional, Generator, Union
+from types import MappingProxyType
+from urllib.parse import quote_plus
+from typing import Dict, List, Any, Optional, Generator, Union, NamedTuple
+
+def _reject_non_finite(obj: Any) -> None:
+    """与 json.dumps(allow_nan=False) 一致：遇到 NaN/Infinity 时抛出 ValueError"""
+    if isinstance(obj, float):
+        if not math.isfinite(obj):
+            raise ValueError("Out of range float values are not JSON compliant")
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _reject_non_finite(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _reject_non_finite(value)
+
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        # orjson会把NaN/Infinity静默写成null，这里先校验以保持与标准库一致
+        _reject_non_finite(obj)
+        return orjson.dumps(obj)
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, allow_nan=False).encode("utf-8")
+
+# 签名规范串中的固定片段：
+# requestId,{request_id},timestamp,{ts},user_id,{user_id}|{message}|{ts}
+_SIG_REQUEST_ID = b"requestId,"
+_SIG_TIMESTAMP = b",timestamp,"
+_SIG_USER_ID = b",user_id,"
+_SIG_SEP = b"|"
+
+# SSE数据行: 匹配 "data: <payload>"，payload两端空白由调用方strip
+_SSE_DATA_RE = re.compile(rb"^data: (.*)$", re.M)
+
+
+def _classify_model(model: str, upstream_model_id: str) -> tuple:
+    """
+    根据模型名称判断模型特性
+    
+    Returns:
+        tuple: (上游模型ID, 是否思考模式, 是否搜索模式, MCP服务器元组)
+    """
+    is_thinking = "thinking" in model.lower()
+    is_search = "search" in model.lower()
+    mcp_servers = ("deep-web-search",) if is_search and "4.5" in model else ()
+    return (upstream_model_id, is_thinking, is_search, mcp_servers)
+
+
+class PreparedChat(NamedTuple):
+    """已签名的聊天请求，可重复发送（如重试时）"""
+    url: str
+    headers: Dict[str, str]
+    body: Dict[str, Any]
 
 
 class ZAIClient:
@@ -37,21 +100,84 @@ class ZAIClient:
         "GLM-4.6-Search": "GLM-4-6-API-V1",
     }
     
-    def __init__(self, token: Optional[str] = None, anonymous: bool = True):
+    # 已知模型的预计算特性: 模型名 -> (上游模型ID, 思考, 搜索, MCP服务器)
+    _MODEL_META = {
+        name: _classify_model(name, upstream)
+        for name, upstream in MODEL_MAPPING.items()
+    }
+    
+    # 请求体/请求头中的静态部分，每次请求只浅拷贝并填充变化字段
+    _STATIC_VARIABLES = MappingProxyType({
+        "{{USER_NAME}}": "Guest",
+        "{{USER_LOCATION}}": "Unknown",
+        "{{CURRENT_TIMEZONE}}": "Asia/Shanghai",
+        "{{USER_LANGUAGE}}": "zh-CN",
+    })
+    _STATIC_FEATURES = MappingProxyType({
+        "image_generation": False,
+        "preview_mode": False,
+    })
+    _BACKGROUND_TASKS = MappingProxyType({
+        "title_generation": False,
+        "tags_generation": False,
+    })
+    _BASE_HEADERS = MappingProxyType({
+        "Content-Type": "application/json",
+        "Accept": "application/json, text/event-stream",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        "Accept-Language": "zh-CN,zh;q=0.9",
+        "X-FE-Version": "prod-fe-1.0.79",
+    })
+    
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        anonymous: bool = True,
+        sign: bool = True,
+        pool_size: int = 32
+    ):
         """
         初始化 Z.AI 客户端
         
         Args:
             token: 用户认证token（可选），如果提供则使用认证模式
             anonymous: 是否使用匿名模式（默认True），匿名模式会自动获取访客token
+            sign: 是否对请求签名（默认True），仅在确认服务端不校验签名时关闭
+            pool_size: 连接池保持的最大keep-alive连接数（默认32），
+                也是 chat_many() 的并发上限
         """
         self.base_url = "https://chat.z.ai"
         self.api_url = f"{self.base_url}/api/chat/completions"
         self.auth_url = f"{self.base_url}/api/v1/auths/"
+        # 查询参数中current_url的固定前缀（已URL编码）
+        self._current_url_prefix = quote_plus(f"{self.base_url}/c/")
         self.token = token
         self.anonymous = anonymous
+        self.sign = sign
         self.signing_secret = "junjie"  # Z.AI的默认签名密钥
+        self._root_key = self.signing_secret.encode("utf-8")
+        # 签名缓存: (window_index, 已载入派生密钥的HMAC对象)，窗口内复用
+        self._primed_mac_cache = (None, None)
+        # user_id缓存: (token, user_id)，token不变时跳过JWT解码
+        # 只保留最近一个，避免匿名模式下访客token不断累积
+        self._uid_cache = (None, None)
         
+        # 复用连接池，避免每次请求重新建立TCP+TLS连接
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+    
+    def close(self):
+        """关闭底层HTTP连接池"""
+        self.session.close()
+    
+    def __enter__(self) -> "ZAIClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
     def get_guest_token(self) -> str:
         """
         获取访客令牌（匿名模式）
@@ -70,7 +196,7 @@ class ZAIClient:
         }
         
         try:
-            response = requests.get(self.auth_url, headers=headers, timeout=10)
+            response = self.session.get(self.auth_url, headers=headers, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 token = data.get("token", "")
@@ -89,21 +215,32 @@ class ZAIClient:
         raise Exception("未配置token且未启用匿名模式")
     
     def _generate_uuid(self) -> str:
-        """生成UUID"""
-        return str(uuid.uuid4())
+        """生成UUID（v4格式，直接基于os.urandom，省去uuid.UUID对象构造）"""
+        b = bytearray(os.urandom(16))
+        b[6] = (b[6] & 0x0F) | 0x40  # version 4
+        b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+        h = b.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
     
     def _extract_user_id_from_token(self, token: str) -> str:
         """从JWT token中提取user_id"""
+        cached_token, cached_uid = self._uid_cache
+        if cached_token == token:
+            return cached_uid
+        user_id = self._decode_user_id(token)
+        self._uid_cache = (token, user_id)
+        return user_id
+    
+    def _decode_user_id(self, token: str) -> str:
+        """解析JWT payload中的user_id，失败时返回guest"""
+        if "." not in token:
+            return "guest"
         try:
-            parts = token.split(".")
-            if len(parts) < 2:
-                return "guest"
-            
             # Base64解码payload
-            payload_raw = parts[1]
+            payload_raw = token.split(".")[1]
             padding = "=" * (-len(payload_raw) % 4)
             payload_bytes = base64.urlsafe_b64decode(payload_raw + padding)
-            payload = json.loads(payload_bytes.decode("utf-8", errors="ignore"))
+            payload = _json_loads(payload_bytes.decode("utf-8", errors="ignore"))
             
             # 尝试多个可能的user_id字段
             for key in ("id", "user_id", "uid", "sub"):
@@ -139,41 +276,45 @@ class ZAIClient:
         # 计算时间窗口索引（5分钟窗口）
         window_index = timestamp_ms // (5 * 60 * 1000)
         
-        # Layer1: 派生密钥
-        root_key = self.signing_secret.encode("utf-8")
-        derived_hex = hmac.new(
-            root_key, 
-            str(window_index).encode("utf-8"), 
-            hashlib.sha256
-        ).hexdigest()
+        # Layer1: 派生密钥（同一窗口内只计算一次）
+        # 缓存已完成密钥编排的HMAC对象，每次请求只需copy后update
+        cached_window, primed_mac = self._primed_mac_cache
+        if cached_window != window_index:
+            # hmac.digest 为单次调用的OpenSSL快速路径，不创建HMAC对象
+            # 注意：服务端以派生密钥的hex文本作为Layer2密钥，不能改用原始digest
+            derived_key = binascii.hexlify(hmac.digest(
+                self._root_key, 
+                str(window_index).encode("utf-8"), 
+                "sha256"
+            ))
+            primed_mac = hmac.new(derived_key, digestmod="sha256")
+            self._primed_mac_cache = (window_index, primed_mac)
         
-        # Layer2: 生成签名
-        canonical_string = (
-            f"requestId,{request_id},"
-            f"timestamp,{timestamp_ms},"
-            f"user_id,{user_id}|{message_text}|{timestamp_ms}"
-        )
-        signature = hmac.new(
-            derived_hex.encode("utf-8"),
-            canonical_string.encode("utf-8"),
-            hashlib.sha256
-        ).hexdigest()
+        # Layer2: 生成签名，逐段喂入规范串，不拼接中间字符串
+        ts = str(timestamp_ms).encode("ascii")
+        mac = primed_mac.copy()
+        mac.update(_SIG_REQUEST_ID)
+        mac.update(request_id.encode("utf-8"))
+        mac.update(_SIG_TIMESTAMP)
+        mac.update(ts)
+        mac.update(_SIG_USER_ID)
+        mac.update(user_id.encode("utf-8"))
+        mac.update(_SIG_SEP)
+        mac.update(message_text.encode("utf-8"))
+        mac.update(_SIG_SEP)
+        mac.update(ts)
         
-        return signature
+        return mac.hexdigest()
     
     def _build_headers(self, token: str, chat_id: str, signature: str) -> Dict[str, str]:
         """构建请求头"""
-        return {
-            "Content-Type": "application/json",
-            "Accept": "application/json, text/event-stream",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept-Language": "zh-CN,zh;q=0.9",
-            "Authorization": f"Bearer {token}",
-            "X-Signature": signature,
-            "X-FE-Version": "prod-fe-1.0.79",
-            "Origin": self.base_url,
-            "Referer": f"{self.base_url}/c/{chat_id}",
-        }
+        headers = dict(self._BASE_HEADERS)
+        headers["Authorization"] = f"Bearer {token}"
+        if signature:
+            headers["X-Signature"] = signature
+        headers["Origin"] = self.base_url
+        headers["Referer"] = f"{self.base_url}/c/{chat_id}"
+        return headers
     
     def _build_request_body(
         self,
@@ -183,47 +324,40 @@ class ZAIClient:
         **kwargs
     ) -> Dict[str, Any]:
         """构建请求体"""
-        # 获取上游模型ID
-        upstream_model_id = self.MODEL_MAPPING.get(model, "0727-360B-API")
+        # 获取上游模型ID及模型特性（已知模型直接查表）
+        meta = self._MODEL_META.get(model)
+        if meta is None:
+            meta = _classify_model(model, "0727-360B-API")
+        upstream_model_id, is_thinking, is_search, mcp_servers = meta
+        mcp_servers = list(mcp_servers)
         
-        # 判断模型特性
-        is_thinking = "thinking" in model.lower()
-        is_search = "search" in model.lower()
-        
-        # 构建MCP服务器列表
-        mcp_servers = []
-        if is_search and "4.5" in model:
-            mcp_servers.append("deep-web-search")
+        # 时间相关变量只取一次当前时间
+        now = datetime.now()
+        current_date = now.strftime("%Y-%m-%d")
+        current_time = now.strftime("%H:%M:%S")
         
         # 构建请求体
         body = {
-            "stream": kwargs.get("stream", True),
+            "stream": True,
             "model": upstream_model_id,
             "messages": messages,
             "params": {},
             "features": {
-                "image_generation": False,
+                **self._STATIC_FEATURES,
                 "web_search": is_search,
                 "auto_web_search": is_search,
-                "preview_mode": False,
                 "flags": [],
                 "features": [],
                 "enable_thinking": is_thinking,
             },
-            "background_tasks": {
-                "title_generation": False,
-                "tags_generation": False,
-            },
+            "background_tasks": dict(self._BACKGROUND_TASKS),
             "mcp_servers": mcp_servers,
             "variables": {
-                "{{USER_NAME}}": "Guest",
-                "{{USER_LOCATION}}": "Unknown",
-                "{{CURRENT_DATETIME}}": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "{{CURRENT_DATE}}": datetime.now().strftime("%Y-%m-%d"),
-                "{{CURRENT_TIME}}": datetime.now().strftime("%H:%M:%S"),
-                "{{CURRENT_WEEKDAY}}": datetime.now().strftime("%A"),
-                "{{CURRENT_TIMEZONE}}": "Asia/Shanghai",
-                "{{USER_LANGUAGE}}": "zh-CN",
+                **self._STATIC_VARIABLES,
+                "{{CURRENT_DATETIME}}": f"{current_date} {current_time}",
+                "{{CURRENT_DATE}}": current_date,
+                "{{CURRENT_TIME}}": current_time,
+                "{{CURRENT_WEEKDAY}}": now.strftime("%A"),
             },
             "model_item": {
                 "id": upstream_model_id,
@@ -279,6 +413,32 @@ class ZAIClient:
             )
             print(response)
         """
+        return self.send(self.prepare(messages, model, **kwargs), stream=stream)
+    
+    def prepare(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "GLM-4.6",
+        **kwargs
+    ) -> PreparedChat:
+        """
+        构建并签名聊天请求，但不发送
+        
+        返回的请求可多次交给 send() 发送，重试时无需重新获取token、
+        生成ID和计算签名。签名绑定请求时间戳，超出服务端容忍的时间窗口后
+        应重新 prepare()。
+        
+        Args:
+            messages: 消息列表，同 chat()
+            model: 模型名称，同 chat()
+            **kwargs: 其他参数，同 chat()；stream 在 send() 时指定，此处忽略
+            
+        Returns:
+            PreparedChat: 已签名的请求
+        """
+        # 上游总是以SSE返回，请求体固定为流式，是否聚合由 send() 决定
+        kwargs.pop("stream", None)
+        
         # 获取token
         token = self._get_token()
         
@@ -288,75 +448,162 @@ class ZAIClient:
         timestamp_ms = int(time.time() * 1000)
         user_id = self._extract_user_id_from_token(token)
         
-        # 提取最后一条用户消息用于签名
-        last_user_message = ""
-        for msg in reversed(messages):
-            if msg.get("role") == "user":
-                last_user_message = msg.get("content", "")
-                break
-        
-        # 生成签名
-        signature = self._generate_signature(
-            last_user_message,
-            request_id,
-            timestamp_ms,
-            user_id
-        )
+        # 生成签名（未启用签名时跳过两层HMAC）
+        signature = ""
+        if self.sign:
+            # 提取最后一条用户消息用于签名
+            last_user_message = ""
+            for msg in reversed(messages):
+                if msg.get("role") == "user":
+                    last_user_message = msg.get("content", "")
+                    break
+            
+            signature = self._generate_signature(
+                last_user_message,
+                request_id,
+                timestamp_ms,
+                user_id
+            )
         
         # 构建请求
         headers = self._build_headers(token, chat_id, signature)
-        body = self._build_request_body(messages, model, chat_id, stream=stream, **kwargs)
+        body = self._build_request_body(messages, model, chat_id, **kwargs)
         
         # 构建URL（带查询参数）
-        query_params = {
-            "timestamp": timestamp_ms,
-            "requestId": request_id,
-            "user_id": user_id,
-            "token": token,
-            "current_url": f"{self.base_url}/c/{chat_id}",
-            "pathname": f"/c/{chat_id}",
-            "signature_timestamp": timestamp_ms,
-        }
-        url = f"{self.api_url}?{urlencode(query_params)}"
+        # UUID和时间戳本身URL安全，只对user_id和token做编码
+        url = (
+            f"{self.api_url}?timestamp={timestamp_ms}"
+            f"&requestId={request_id}"
+            f"&user_id={quote_plus(user_id)}"
+            f"&token={quote_plus(token)}"
+            f"&current_url={self._current_url_prefix}{chat_id}"
+            f"&pathname=%2Fc%2F{chat_id}"
+        )
+        if signature:
+            url += f"&signature_timestamp={timestamp_ms}"
         
-        # 发送请求
+        return PreparedChat(url=url, headers=headers, body=body)
+    
+    def send(
+        self,
+        prepared: PreparedChat,
+        stream: bool = True
+    ) -> Union[Generator[str, None, None], Dict[str, Any]]:
+        """
+        发送 prepare() 构建好的请求
+        
+        Args:
+            prepared: prepare() 返回的请求
+            stream: 是否流式输出（默认True）
+            
+        Returns:
+            同 chat()
+        """
         if stream:
-            return self._stream_request(url, headers, body)
+            return self._stream_request(prepared.url, prepared.headers, prepared.body)
         else:
-            return self._non_stream_request(url, headers, body)
+            return self._non_stream_request(prepared.url, prepared.headers, prepared.body)
     
-    def _stream_request(
+    def chat_many(
+        self,
+        batch: List[List[Dict[str, str]]],
+        model: str = "GLM-4.6",
+        max_concurrency: int = 8,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        并发发送多组聊天请求（非流式），共享同一个连接池
+        
+        Args:
+            batch: 多组消息列表，每组格式同 chat() 的 messages
+            model: 模型名称
+            max_concurrency: 最大并发数（默认8），不超过连接池大小，
+                以保证每个并发请求都能复用池中的连接
+            **kwargs: 其他参数，同 chat()
+            
+        Returns:
+            List[Dict]: 与 batch 顺序一致的响应列表
+        """
+        def _run(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+            return self.chat(messages, model=model, stream=False, **kwargs)
+        
+        max_workers = max(1, min(max_concurrency, self.pool_size))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_run, batch))
+    
+    def _post_stream(
         self, 
         url: str, 
         headers: Dict[str, str], 
         body: Dict[str, Any]
-    ) -> Generator[str, None, None]:
-        """流式请求 - 修复了中文乱码问题"""
-        response = requests.post(
+    ) -> requests.Response:
+        """发起流式POST请求并检查状态码"""
+        response = self.session.post(
             url,
             headers=headers,
-            json=body,
+            data=_json_dumps(body),
             stream=True,
             timeout=60
         )
         
         if response.status_code != 200:
+            # 失败时也要关闭响应，将连接归还连接池
+            response.close()
             raise Exception(f"请求失败: {response.status_code}")
+        return response
+    
+    def _iter_sse_bytes(
+        self, 
+        url: str, 
+        headers: Dict[str, str], 
+        body: Dict[str, Any]
+    ) -> Generator[bytes, None, None]:
+        """流式请求，按行返回未解码的原始字节"""
+        # 生成器结束或被提前关闭时释放响应，连接归还连接池
+        with self._post_stream(url, headers, body) as response:
+            yield from response.iter_lines(decode_unicode=False)  # 不自动解码
+    
+    def _iter_sse_payloads(
+        self, 
+        url: str, 
+        headers: Dict[str, str], 
+        body: Dict[str, Any]
+    ) -> Generator[bytes, None, None]:
+        """
+        流式请求，返回每条SSE数据行的payload（原始字节）
         
-        for line in response.iter_lines(decode_unicode=False):  # 不自动解码
+        直接在接收到的数据块上用正则扫描，不逐行切分；
+        末尾不完整的行留到下一个数据块再处理。
+        SSE允许 \r\n、\n、\r 三种行尾，统一归一化为 \n 后再扫描
+        """
+        pending = b""
+        with self._post_stream(url, headers, body) as response:
+            for block in response.iter_content(chunk_size=None):
+                if b"\r" in block:
+                    block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+                buffer = pending + block if pending else block
+                end = buffer.rfind(b"\n")
+                if end < 0:
+                    pending = buffer
+                    continue
+                for match in _SSE_DATA_RE.finditer(buffer, 0, end):
+                    yield match.group(1)
+                pending = buffer[end + 1:]
+        if pending:
+            for match in _SSE_DATA_RE.finditer(pending):
+                yield match.group(1)
+    
+    def _stream_request(
+        self, 
+        url: str, 
+        headers: Dict[str, str], 
+        body: Dict[str, Any]
+    ) -> Generator[str, None, None]:
+        """流式请求 - 修复了中文乱码问题"""
+        for line in self._iter_sse_bytes(url, headers, body):
             if line:
-                try:
-                    # 手动解码并确保中文正确显示
-                    decoded_line = line.decode('utf-8')
-                    yield decoded_line + "\n"
-                except UnicodeDecodeError:
-                    # 如果utf-8解码失败，尝试其他常见编码
-                    try:
-                        decoded_line = line.decode('latin-1')
-                        yield decoded_line + "\n"
-                    except:
-                        # 无法解码时，跳过该行或返回原始内容
-                        pass
+                # 手动解码并确保中文正确显示，非法字节替换为U+FFFD
+                yield line.decode('utf-8', errors='replace') + "\n"
     
     def _non_stream_request(
         self, 
@@ -365,31 +612,31 @@ class ZAIClient:
         body: Dict[str, Any]
     ) -> Dict[str, Any]:
         """非流式请求（聚合流式响应）"""
-        # Z.AI总是返回流式，需要聚合
-        full_content = ""
-        reasoning_content = ""
+        # Z.AI总是返回流式，需要聚合；先收集片段最后统一拼接
+        answer_parts = []
+        thinking_parts = []
         
-        for line in self._stream_request(url, headers, {**body, "stream": True}):
-            if not line.startswith("data: "):
-                continue
-            
-            data_str = line[6:].strip()
-            if data_str in ["[DONE]", ""]:
+        # 直接处理字节payload，省去逐行解码；JSON解析器可直接解析bytes
+        for payload in self._iter_sse_payloads(url, headers, body):
+            data_bytes = payload.strip()
+            if data_bytes in (b"[DONE]", b""):
                 continue
             
             try:
-                chunk = json.loads(data_str)
+                chunk = _json_loads(data_bytes)
                 if chunk.get("type") == "chat:completion":
                     data = chunk.get("data", {})
                     phase = data.get("phase")
                     
                     if phase == "thinking":
-                        reasoning_content += data.get("delta_content", "")
+                        thinking_parts.append(data.get("delta_content", ""))
                     elif phase == "answer":
-                        full_content += data.get("delta_content", "")
+                        answer_parts.append(data.get("delta_content", ""))
             except:
                 pass
         
+        full_content = "".join(answer_parts)
+        reasoning_content = "".join(thinking_parts)
         return {
             "content": full_content.strip(),
             "reasoning_content": reasoning_content.strip() if reasoning_content else None
@@ -409,7 +656,7 @@ class ZAIClient:
             data_str = chunk[6:].strip()
             if data_str not in ["[DONE]", ""]:
                 try:
-                    parsed = json.loads(data_str)
+                    parsed = _json_loads(data_str)
                     if parsed.get("type") == "chat:completion":
                         data = parsed.get("data", {})
                         return data.get("delta_content", "")
@@ -428,8 +675,6 @@ if __name__ == "__main__":
     print("示例1: 匿名模式的基本对话（流式）")
     print("=" * 60)
     
-    client = ZAIClient(anonymous=True)
-    
     messages = [
         {"role": "user", "content": "你好，请用一句话介绍一下自己"}
     ]
@@ -437,10 +682,11 @@ if __name__ == "__main__":
     print("用户: 你好，请用一句话介绍一下自己")
     print("助手: ", end="", flush=True)
     
-    # 使用get_content_from_chunk方法提取内容并避免乱码
-    for chunk in client.chat(messages):
-        content = client.get_content_from_chunk(chunk)
-        if content:
-            print(content, end="", flush=True)
+    with ZAIClient(anonymous=True) as client:
+        # 使用get_content_from_chunk方法提取内容并避免乱码
+        for chunk in client.chat(messages):
+            content = client.get_content_from_chunk(chunk)
+            if content:
+                print(content, end="", flush=True)
     
     print("\n\n示例执行完毕！")
\ No newline at end of file